@@ -3,15 +3,45 @@ ENVIRONMENTAL INEQUALITY DASHBOARD - WITH ENHANCED MAP (FIXED)
 Fixed to handle missing columns
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, request, send_from_directory
+from markupsafe import escape
+import numpy as np
 import pandas as pd
 import folium
 import plotly.graph_objects as go
 import plotly
-import json
+import gzip
+import hashlib
+import orjson
+import os
 
 app = Flask(__name__)
 
+DATA_PATH = 'pune_environmental_data.csv'
+PARQUET_PATH = 'pune_environmental_data.parquet'
+
+# Explicit column types for the CSV fallback, so pandas skips type inference.
+# Measurements stay float64: float32 would leak rounding noise (84.93 ->
+# 84.93000030517578) into every JSON payload for no measurable gain here.
+CSV_DTYPES = {
+    'ward': 'string',
+    'pm25': 'float64',
+    'heat': 'float64',
+    'pop_density': 'float64',
+    'green_cover': 'float64',
+    'esi': 'float64',
+    'stress_zone': 'string',
+    'latitude': 'float64',
+    'longitude': 'float64',
+}
+
+STRESS_COLORS = {'High Stress': '#e74c3c', 'Medium Stress': '#f39c12', 'Low Stress': '#2ecc71'}
+
+# stress_zone is stored as a categorical whose first codes (0, 1, 2) are these
+# zones, so zone comparisons are int8 code compares instead of string compares.
+# Any other label found in the data is appended as an extra category.
+STRESS_ZONES = list(STRESS_COLORS)
+
 # ============================================================================
 # LOAD DATA AT STARTUP
 # ============================================================================
@@ -22,9 +52,42 @@ print("="*80)
 
 df = None
 
+# Stress-zone groups, computed once so no handler rescans df with a mask
+ZONE_COUNTS = {}  # zone -> number of wards
+ZONE_IDX = {}     # zone -> positional row indices
+
+# Columns used by the insight scalars, as plain ndarrays
+PM25 = np.empty(0)
+WARDS = np.empty(0, dtype=object)
+
+# Columns holding one value for every ward (e.g. the defaults filled in
+# below); sums over them reduce to value * ward count
+CONSTANT_VALUES = {}
+
+def _load_data():
+    """Read the typed Parquet copy of the dataset, falling back to the CSV
+
+    The CSV is the source of truth. The Docker build generates the Parquet
+    copy; to use it locally, regenerate it whenever the CSV changes:
+        pd.read_csv(DATA_PATH).to_parquet(PARQUET_PATH, compression='zstd', index=False)
+    """
+    if os.path.exists(PARQUET_PATH):
+        if os.path.exists(DATA_PATH) and os.path.getmtime(DATA_PATH) > os.path.getmtime(PARQUET_PATH):
+            print(f"⚠️  {PARQUET_PATH} is older than {DATA_PATH} - loading the CSV instead")
+        else:
+            try:
+                data = pd.read_parquet(PARQUET_PATH)
+                print(f"✅ PARQUET LOADED: {len(data)} rows")
+                return data
+            except Exception as e:
+                print(f"⚠️  Could not read {PARQUET_PATH} ({e}) - falling back to CSV")
+    
+    data = pd.read_csv(DATA_PATH, engine='pyarrow', dtype=CSV_DTYPES)
+    print(f"✅ CSV LOADED: {len(data)} rows")
+    return data
+
 try:
-    df = pd.read_csv('pune_environmental_data.csv')
-    print(f"✅ CSV LOADED: {len(df)} rows")
+    df = _load_data()
     print(f"✅ Columns: {list(df.columns)}")
     
     # Fix column names
@@ -42,380 +105,474 @@ try:
         print("⚠️  'total_budget' column not found - using default values")
         df['total_budget'] = 100000000  # Default budget in Crores
     
+    unknown_zones = sorted(set(df['stress_zone'].dropna().unique()) - set(STRESS_ZONES))
+    if unknown_zones:
+        print(f"⚠️  Unknown stress zones {unknown_zones} - kept as-is and shown in grey")
+    df['stress_zone'] = df['stress_zone'].astype(pd.CategoricalDtype(STRESS_ZONES + unknown_zones))
+    
+    ZONE_COUNTS = df['stress_zone'].value_counts(dropna=False, sort=False).to_dict()
+    zone_codes = df['stress_zone'].cat.codes.to_numpy()
+    ZONE_IDX = {zone: np.flatnonzero(zone_codes == code) for code, zone in enumerate(STRESS_ZONES)}
+    
+    for col in ('population', 'total_budget'):
+        # An all-NaN column also has one distinct value; it must keep
+        # summing to 0 (NaN skipped), not NaN * count
+        if len(df) and df[col].nunique(dropna=False) == 1 and pd.notna(df[col].iloc[0]):
+            CONSTANT_VALUES[col] = df[col].iloc[0]
+    
+    PM25 = df['pm25'].to_numpy()
+    WARDS = df['ward'].to_numpy()
+    
     print(f"✅ Data ready for {len(df)} wards")
     print("="*80 + "\n")
     
 except Exception as e:
-    print(f"❌ ERROR LOADING CSV: {e}")
+    print(f"❌ ERROR LOADING DATA: {e}")
     print("="*80 + "\n")
     df = None
 
 # ============================================================================
-# ROUTES
+# STATIC CONTENT
 # ============================================================================
 
-@app.route('/')
-def index():
-    return render_template('dashboard.html')
+FAQ = [
+    {
+        'question': 'What does "High Stress" mean?',
+        'answer': 'High Stress wards have ESI > 0.65, indicating environmental challenges requiring immediate intervention.'
+    },
+    {
+        'question': 'How is ESI calculated?',
+        'answer': 'Environmental Stress Index = 40% PM2.5 + 20% Heat + 25% Density + 15% Green Deficit'
+    },
+    {
+        'question': 'Which wards need priority?',
+        'answer': 'High Stress wards with high population density should get priority.'
+    },
+    {
+        'question': 'How can ESI be reduced?',
+        'answer': '1) Plant trees (green cover) → 25-30% reduction\n2) Reduce emissions → 15-20% reduction\n3) Improve monitoring'
+    },
+    {
+        'question': 'What is PM2.5?',
+        'answer': 'Particulate matter < 2.5µm. WHO safe limit: 15 µg/m³. High PM2.5 causes respiratory problems.'
+    },
+]
 
-@app.route('/api/overview', methods=['GET'])
-def get_overview():
-    """Get overview statistics"""
-    if df is None:
-        return jsonify({
-            'total_wards': 0,
-            'high_stress_count': 0,
-            'medium_stress_count': 0,
-            'low_stress_count': 0,
-            'avg_pm25': 0,
-            'avg_esi': 0,
-        }), 200
+# Serialized once at import; the FAQ never changes while the app runs
+FAQ_BYTES = orjson.dumps(FAQ)
+FAQ_HEADERS = {'Cache-Control': 'public, max-age=86400'}
+
+# ============================================================================
+# PAYLOAD BUILDERS
+# ============================================================================
+
+def _zone_colors(df):
+    """Marker colour per ward, grey for wards outside the known stress zones"""
+    categories = df['stress_zone'].cat.categories
+    palette = np.array([STRESS_COLORS.get(zone, '#999') for zone in categories] + ['#999'])
+    return palette[df['stress_zone'].cat.codes.to_numpy()]  # code -1 (missing) -> '#999'
+
+def _build_overview(df):
+    """Overview statistics"""
+    # Zone counts come from the single value_counts pass done at load, the
+    # two averages from one column-wise mean
+    means = df[['pm25', 'esi']].mean()
     
-    try:
-        high = int(len(df[df['stress_zone'] == 'High Stress']))
-        medium = int(len(df[df['stress_zone'] == 'Medium Stress']))
-        low = int(len(df[df['stress_zone'] == 'Low Stress']))
-        
-        data = {
-            'total_wards': int(len(df)),
-            'high_stress_count': high,
-            'medium_stress_count': medium,
-            'low_stress_count': low,
-            'avg_pm25': round(float(df['pm25'].mean()), 1),
-            'avg_esi': round(float(df['esi'].mean()), 3),
-        }
+    return {
+        'total_wards': int(len(df)),
+        'high_stress_count': int(ZONE_COUNTS.get('High Stress', 0)),
+        'medium_stress_count': int(ZONE_COUNTS.get('Medium Stress', 0)),
+        'low_stress_count': int(ZONE_COUNTS.get('Low Stress', 0)),
+        'avg_pm25': round(float(means['pm25']), 1),
+        'avg_esi': round(float(means['esi']), 3),
+    }
+
+def _build_stress_fig(df):
+    """Stress distribution pie chart, as a plain figure dict
+
+    The chart is three slices, so the dict is written out directly rather
+    than going through go.Figure validation and plotly.io.to_json.
+    """
+    return {
+        'data': [{
+            'type': 'pie',
+            'labels': list(STRESS_COLORS),
+            'values': [int(ZONE_COUNTS.get(zone, 0)) for zone in STRESS_COLORS],
+            'marker': {'colors': list(STRESS_COLORS.values())},
+            'textinfo': 'label+percent+value',
+        }],
+        'layout': {'title': {'text': 'Stress Zone Distribution'}, 'height': 450},
+    }
+
+def _build_pm25_fig(df):
+    """PM2.5 vs Green Cover scatter"""
+    # A single WebGL trace coloured per point, zone shown in the hover text.
+    # Plain lists rather than ndarrays: plotly.py encodes ndarrays as binary
+    # typed arrays, which the plotly.js build loaded by the dashboard predates.
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=(df['green_cover'].to_numpy() * 100).tolist(),
+        y=df['pm25'].to_numpy().tolist(),
+        mode='markers',
+        marker=dict(size=10, color=_zone_colors(df).tolist(), opacity=0.7),
+        text=df['ward'].tolist(),
+        customdata=df['stress_zone'].tolist(),
+        hovertemplate='<b>%{text}</b><br>Green: %{x:.1f}%<br>PM2.5: %{y:.1f}<br>%{customdata}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title='PM2.5 vs Green Cover',
+        xaxis_title='Green Cover (%)',
+        yaxis_title='PM2.5 (µg/m³)',
+        showlegend=False,
+        height=450
+    )
+    return fig
+
+# Ward popup, compiled once; the .html template is autoescaped, so ward names
+# and zone labels are HTML-escaped on render
+POPUP_TEMPLATE = app.jinja_env.get_template('popup.html')
+
+def _build_map(df):
+    """Enhanced interactive map with detailed popups"""
+    # Create Folium map with better styling
+    m = folium.Map(
+        location=[18.52, 73.85],
+        zoom_start=11,
+        tiles='OpenStreetMap'
+    )
+
+    # Per-ward marker styling, computed column-wise up front
+    radius_arr = np.clip(5 + df['esi'].to_numpy() * 20, 8, 25)
+    color_arr = _zone_colors(df)
+    
+    rows = df[['ward', 'lat', 'lon', 'pm25', 'heat', 'green_cover',
+               'pop_density', 'esi', 'stress_zone', 'population']].itertuples(index=False, name=None)
+    
+    # Collect one GeoJSON point feature per ward
+    features = []
+    for row, radius, color in zip(rows, radius_arr, color_arr):
+        ward, lat, lon, pm25, heat, green_cover, pop_density, esi, stress, population = row
         
-        print(f"✅ Overview API called: {data}")
-        return jsonify(data), 200
+        popup_html = POPUP_TEMPLATE.render(
+            ward=ward, lat=lat, lon=lon, pm25=pm25, heat=heat, green_cover=green_cover,
+            pop_density=pop_density, esi=esi, stress=stress, population=population, color=color,
+        )
         
-    except Exception as e:
-        print(f"❌ Overview error: {e}")
-        return jsonify({'error': str(e)}), 500
+        features.append({
+            'type': 'Feature',
+            'id': str(len(features)),
+            'geometry': {'type': 'Point', 'coordinates': [float(lon), float(lat)]},
+            'properties': {
+                'radius': float(radius),
+                'color': color,
+                'popup_html': popup_html,
+                'tooltip_html': f"<b>{escape(ward)}</b><br>ESI: {esi:.3f}<br>Stress: {escape(stress)}",
+            },
+        })
+    
+    # One GeoJSON layer for every ward: Leaflet instantiates the circles from a
+    # single FeatureCollection instead of one <script> block per marker
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        marker=folium.CircleMarker(fill=True, fill_opacity=0.7, weight=2),
+        style_function=lambda feature: {
+            'radius': feature['properties']['radius'],
+            'color': feature['properties']['color'],
+            'fillColor': feature['properties']['color'],
+        },
+        popup=folium.GeoJsonPopup(fields=['popup_html'], labels=False, localize=False, max_width=350),
+        tooltip=folium.GeoJsonTooltip(fields=['tooltip_html'], labels=False, localize=False),
+    ).add_to(m)
+    
+    # Add legend
+    legend_html = '''
+    <div style="position: fixed; 
+                bottom: 50px; right: 10px; width: 280px; height: auto; 
+                background-color: white; border:2px solid grey; z-index:9999; font-size:12px;
+                padding: 10px; border-radius: 5px; box-shadow: 0 0 15px rgba(0,0,0,0.2);">
+        <h4 style="margin: 0 0 10px 0; color: #2c3e50; border-bottom: 2px solid #e74c3c; padding-bottom: 5px;">
+            PUNE DISTRICT - ENVIRONMENTAL STRESS ZONES
+        </h4>
 
-@app.route('/api/stress-distribution', methods=['GET'])
-def stress_distribution():
-    """Stress distribution pie chart"""
+        <p style="margin: 8px 0; font-weight: bold; color: #2c3e50;">STRESS LEVELS:</p>
+
+        <div style="margin-bottom: 10px;">
+            <div style="display: flex; align-items: center; margin: 5px 0;">
+                <div style="width: 15px; height: 15px; background: #e74c3c; border-radius: 50%; margin-right: 8px;"></div>
+                <span><b>High Stress</b> - Immediate Intervention (ESI > 0.65)</span>
+            </div>
+            <div style="display: flex; align-items: center; margin: 5px 0;">
+                <div style="width: 15px; height: 15px; background: #f39c12; border-radius: 50%; margin-right: 8px;"></div>
+                <span><b>Medium Stress</b> - Preventive Measures (ESI 0.45-0.65)</span>
+            </div>
+            <div style="display: flex; align-items: center; margin: 5px 0;">
+                <div style="width: 15px; height: 15px; background: #2ecc71; border-radius: 50%; margin-right: 8px;"></div>
+                <span><b>Low Stress</b> - Maintenance Only (ESI < 0.45)</span>
+            </div>
+        </div>
+
+        <p style="margin: 8px 0; font-weight: bold; color: #2c3e50;">CIRCLE SIZE:</p>
+        <p style="margin: 5px 0; font-size: 11px;">
+            • Larger circles = Higher ESI (more stressed)<br>
+            • Smaller circles = Lower ESI (healthier)
+        </p>
+
+    </div>
+    '''
+    m.get_root().html.add_child(folium.Element(legend_html))
+    return m
+
+def _build_wards(df):
+    """All ward data for table, highest ESI first"""
+    # Column selection already returns a new frame, so no .copy() is needed
+    data = df[['ward', 'pm25', 'heat', 'pop_density', 'green_cover', 'esi', 'stress_zone']]
+    return data.sort_values('esi', ascending=False).to_dict('records')
+
+def _column_sum(df, col, idx=None):
+    """Sum of a column over all rows, or over the positional rows in idx"""
+    count = len(df) if idx is None else len(idx)
+    if col in CONSTANT_VALUES:
+        return CONSTANT_VALUES[col] * count
+    values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nansum(values) if idx is None else np.nansum(values[idx])
+
+def _build_insights(df):
+    """Key insights from data"""
+    insights = []
+
+    critical = int(ZONE_COUNTS.get('High Stress', 0))
+    total = len(df)
+    insights.append({
+        'type': 'critical',
+        'icon': '🚨',
+        'title': 'Critical Zones',
+        'text': f"{critical} wards ({critical/total*100:.0f}%) need urgent intervention",
+        'action': 'High ESI > 0.65'
+    })
+
+    worst_idx = np.nanargmax(PM25)
+    worst_ward_name = WARDS[worst_idx]
+    worst_pm25 = PM25[worst_idx]
+    avg_pm25 = np.nanmean(PM25)
+    pct_above = ((worst_pm25 / avg_pm25 - 1) * 100) if avg_pm25 > 0 else 0
+    insights.append({
+        'type': 'pollution',
+        'icon': '💨',
+        'title': 'Pollution Hotspot',
+        'text': f"{worst_ward_name}: {worst_pm25:.1f} µg/m³",
+        'action': f"{pct_above:.0f}% above avg"
+    })
+
+    avg_green = np.nanmean(df['green_cover'].to_numpy())
+    target = 0.25
+    gap = (target - avg_green) * 100
+    insights.append({
+        'type': 'green',
+        'icon': '🌳',
+        'title': 'Green Cover Gap',
+        'text': f"Current: {avg_green*100:.1f}% | Target: 25%",
+        'action': f"Need +{gap:.1f}%"
+    })
+
+    high_idx = ZONE_IDX['High Stress']
+    
+    critical_pop = _column_sum(df, 'population', high_idx) if 'population' in df.columns else 0
+    insights.append({
+        'type': 'population',
+        'icon': '👥',
+        'title': 'Population at Risk',
+        'text': f"{critical_pop/1e6:.1f}M people in critical zones",
+        'action': 'Urgent action'
+    })
+
+    high_budget = _column_sum(df, 'total_budget', high_idx) if 'total_budget' in df.columns else 0
+    total_budget = _column_sum(df, 'total_budget') if 'total_budget' in df.columns else 1
+    pct_budget = (high_budget / total_budget * 100) if total_budget > 0 else 0
+    insights.append({
+        'type': 'budget',
+        'icon': '💰',
+        'title': 'Budget Strategy',
+        'text': f"₹{high_budget/10000000:.1f}Cr to critical zones",
+        'action': f"{pct_budget:.0f}% of total"
+    })
+    return insights
+
+# ============================================================================
+# PRECOMPUTE RESPONSES
+# ============================================================================
+
+# df is never mutated after load, so every API response is built exactly
+# once here and the route handlers only hand back the stored body.
+
+def _dumps(obj):
+    """Serialize to JSON bytes (numpy scalars allowed, NaN becomes null)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _precompute(df):
+    """Serialize every API payload as a (body, status) pair"""
     if df is None:
-        return jsonify({'data': [], 'layout': {}}), 200
+        return {
+            'overview': (_dumps({
+                'total_wards': 0,
+                'high_stress_count': 0,
+                'medium_stress_count': 0,
+                'low_stress_count': 0,
+                'avg_pm25': 0,
+                'avg_esi': 0,
+            }), 200),
+            'stress': (_dumps({'data': [], 'layout': {}}), 200),
+            'pm25_green': (_dumps({'data': [], 'layout': {}}), 200),
+            'map_html': ('<div style="color: red; padding: 2rem;">Error: No data</div>', 200),
+            'wards': (_dumps([]), 200),
+            'insights': (_dumps([]), 200),
+        }
+    
+    precomputed = {}
     
     try:
-        stress_counts = df['stress_zone'].value_counts().to_dict()
-        
-        fig = go.Figure(data=[
-            go.Pie(
-                labels=list(stress_counts.keys()),
-                values=list(stress_counts.values()),
-                marker=dict(colors=['#e74c3c', '#f39c12', '#2ecc71']),
-                textinfo='label+percent+value',
-            )
-        ])
-        fig.update_layout(title='Stress Zone Distribution', height=450)
-        
-        return jsonify(json.loads(plotly.io.to_json(fig))), 200
-        
+        overview = _build_overview(df)
+        print(f"✅ Overview ready: {overview}")
+        precomputed['overview'] = (_dumps(overview), 200)
+    except Exception as e:
+        print(f"❌ Overview error: {e}")
+        precomputed['overview'] = (_dumps({'error': str(e)}), 500)
+    
+    try:
+        precomputed['stress'] = (_dumps(_build_stress_fig(df)), 200)
     except Exception as e:
         print(f"❌ Stress chart error: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/pm25-green', methods=['GET'])
-def pm25_green():
-    """PM2.5 vs Green Cover scatter"""
-    if df is None:
-        return jsonify({'data': [], 'layout': {}}), 200
+        precomputed['stress'] = (_dumps({'error': str(e)}), 500)
     
     try:
-        colors_map = {'High Stress': '#e74c3c', 'Medium Stress': '#f39c12', 'Low Stress': '#2ecc71'}
-        fig = go.Figure()
-        
-        for zone in ['Low Stress', 'Medium Stress', 'High Stress']:
-            zone_data = df[df['stress_zone'] == zone]
-            if len(zone_data) > 0:
-                fig.add_trace(go.Scatter(
-                    x=list(zone_data['green_cover'] * 100),
-                    y=list(zone_data['pm25']),
-                    mode='markers',
-                    name=zone,
-                    marker=dict(size=10, color=colors_map[zone], opacity=0.7),
-                    text=list(zone_data['ward']),
-                    hovertemplate='<b>%{text}</b><br>Green: %{x:.1f}%<br>PM2.5: %{y:.1f}<extra></extra>'
-                ))
-        
-        fig.update_layout(
-            title='PM2.5 vs Green Cover',
-            xaxis_title='Green Cover (%)',
-            yaxis_title='PM2.5 (µg/m³)',
-            height=450
-        )
-        
-        return jsonify(json.loads(plotly.io.to_json(fig))), 200
-        
+        precomputed['pm25_green'] = (plotly.io.to_json(_build_pm25_fig(df), engine='orjson'), 200)
     except Exception as e:
         print(f"❌ PM2.5 chart error: {e}")
-        return jsonify({'error': str(e)}), 500
+        precomputed['pm25_green'] = (_dumps({'error': str(e)}), 500)
+    
+    try:
+        precomputed['map_html'] = (_build_map(df)._repr_html_(), 200)
+        print("✅ Map created successfully")
+    except Exception as e:
+        print(f"❌ Map error: {e}")
+        import traceback
+        traceback.print_exc()
+        precomputed['map_html'] = (f'<div style="color: red; padding: 2rem;">Error: {str(e)}</div>', 200)
+    
+    try:
+        precomputed['wards'] = (_dumps(_build_wards(df)), 200)
+    except Exception as e:
+        print(f"❌ Wards error: {e}")
+        precomputed['wards'] = (_dumps([]), 200)
+    
+    try:
+        precomputed['insights'] = (_dumps(_build_insights(df)), 200)
+    except Exception as e:
+        print(f"❌ Insights error: {e}")
+        precomputed['insights'] = (_dumps([]), 200)
+    
+    return precomputed
+
+PRECOMPUTED = _precompute(df)
+
+# The map page is by far the largest payload, so it is also written to
+# static/ next to a gzip copy. /api/map (or a fronting NGINX with
+# gzip_static on) can then serve the file without re-encoding it.
+MAP_FILE = 'map.html'
+MAP_FILE_GZ = 'map.html.gz'
+
+def _write_static_map(html):
+    """Write the map HTML and its gzip copy to the static folder"""
+    try:
+        os.makedirs(app.static_folder, exist_ok=True)
+        data = html.encode('utf-8')
+        with open(os.path.join(app.static_folder, MAP_FILE), 'wb') as f:
+            f.write(data)
+        with open(os.path.join(app.static_folder, MAP_FILE_GZ), 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        return True
+    except OSError as e:
+        print(f"⚠️  Could not write static map ({e}) - serving it from memory")
+        return False
+
+MAP_STATIC = _write_static_map(PRECOMPUTED['map_html'][0])
+
+# Every payload is fixed for the life of the process, so its hash is a
+# stable ETag and repeat requests can be answered with 304 Not Modified
+def _etag(body):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
+
+PRECOMPUTED_ETAGS = {name: _etag(body) for name, (body, status) in PRECOMPUTED.items()}
+FAQ_ETAG = _etag(FAQ_BYTES)
+
+def _precomputed_response(name, mimetype='application/json'):
+    body, status = PRECOMPUTED[name]
+    response = Response(body, status=status, mimetype=mimetype)
+    if status == 200:
+        response.set_etag(PRECOMPUTED_ETAGS[name])
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        response.make_conditional(request)
+    return response
 
 # ============================================================================
-# API: ENHANCED INTERACTIVE MAP WITH DETAILED POPUPS
+# ROUTES
 # ============================================================================
 
+@app.route('/')
+def index():
+    return render_template('dashboard.html')
+
+@app.route('/api/overview', methods=['GET'])
+def get_overview():
+    """Get overview statistics"""
+    return _precomputed_response('overview')
+
+@app.route('/api/stress-distribution', methods=['GET'])
+def stress_distribution():
+    """Stress distribution pie chart"""
+    return _precomputed_response('stress')
+
+@app.route('/api/pm25-green', methods=['GET'])
+def pm25_green():
+    """PM2.5 vs Green Cover scatter"""
+    return _precomputed_response('pm25_green')
+
 @app.route('/api/map', methods=['GET'])
 def get_map():
     """Enhanced interactive map with detailed popups"""
-    if df is None:
-        return '<div style="color: red; padding: 2rem;">Error: No data</div>', 200
+    if not MAP_STATIC:
+        return _precomputed_response('map_html', mimetype='text/html')
     
-    try:
-        colors = {'High Stress': '#e74c3c', 'Medium Stress': '#f39c12', 'Low Stress': '#2ecc71'}
-        
-        # Create Folium map with better styling
-        m = folium.Map(
-            location=[18.52, 73.85],
-            zoom_start=11,
-            tiles='OpenStreetMap'
+    if request.accept_encodings['gzip']:
+        response = send_from_directory(
+            app.static_folder, MAP_FILE_GZ, mimetype='text/html', download_name=MAP_FILE, max_age=3600
         )
-        
-        # Add circle markers for each ward
-        for idx, row in df.iterrows():
-            stress = row['stress_zone']
-            color = colors.get(stress, '#999')
-            
-            # Size based on ESI value
-            radius = max(8, min(25, 5 + (row['esi'] * 20)))
-            
-            # Get values with defaults for missing columns
-            population = row.get('population', 50000)
-            total_budget = row.get('total_budget', 100000000)
-            
-            # Create detailed popup content
-            popup_html = f"""
-            <div style="font-family: Arial, sans-serif; width: 300px;">
-                <h4 style="margin: 5px 0; color: #2c3e50; border-bottom: 2px solid {color}; padding-bottom: 5px;">
-                    {row['ward']}
-                </h4>
-                
-                <div style="margin-top: 10px;">
-                    <p style="margin: 5px 0;"><b> Geographic Location:</b></p>
-                    <div style="background: #f5f5f5; padding: 8px; border-radius: 4px; margin: 5px 0;">
-                        <p style="margin: 3px 0; font-size: 12px;">
-                            <b>Coordinates:</b> ({row['lat']:.4f}, {row['lon']:.4f})
-                        </p>
-                    </div>
-                </div>
-                
-                <div style="margin-top: 10px;">
-                    <p style="margin: 5px 0;"><b> Environmental Metrics:</b></p>
-                    <table style="width: 100%; font-size: 12px; border-collapse: collapse;">
-                        <tr style="background: #f9f9f9;">
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b>PM2.5</b></td>
-                            <td style="padding: 5px; border: 1px solid #ddd;">{row['pm25']:.1f} µg/m³</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b>Heat</b></td>
-                            <td style="padding: 5px; border: 1px solid #ddd;">{row['heat']:.1f}°C</td>
-                        </tr>
-                        <tr style="background: #f9f9f9;">
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b>Green Cover</b></td>
-                            <td style="padding: 5px; border: 1px solid #ddd;">{row['green_cover']*100:.1f}%</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b>Population Density</b></td>
-                            <td style="padding: 5px; border: 1px solid #ddd;">{row['pop_density']:.0f}/km²</td>
-                        </tr>
-                        <tr style="background: #f9f9f9;">
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b>ESI Score</b></td>
-                            <td style="padding: 5px; border: 1px solid #ddd;"><b style="color: {color};">{row['esi']:.3f}</b></td>
-                        </tr>
-                    </table>
-                </div>
-                
-                <div style="margin-top: 10px;">
-                    <p style="margin: 5px 0;"><b> Stress Zone:</b></p>
-                    <div style="padding: 6px; background: {color}; color: white; border-radius: 4px; text-align: center; font-weight: bold;">
-                        {stress}
-                    </div>
-                </div>
-                
-                <div style="margin-top: 10px;">
-                    <p style="margin: 5px 0;"><b>👥 Population Information:</b></p>
-                    <p style="font-size: 12px; margin: 5px 0;">
-                        Total Population: <b>{int(population):,}</b>
-                    </p>
-                </div>
-                
-               
-                    </p>
-                </div>
-            </div>
-            """
-            
-            popup = folium.Popup(popup_html, max_width=350)
-            
-            # Add circle marker
-            folium.CircleMarker(
-                location=[row['lat'], row['lon']],
-                radius=radius,
-                popup=popup,
-                color=color,
-                fill=True,
-                fillColor=color,
-                fillOpacity=0.7,
-                weight=2,
-                tooltip=f"<b>{row['ward']}</b><br>ESI: {row['esi']:.3f}<br>Stress: {stress}"
-            ).add_to(m)
-        
-        # Add legend
-        legend_html = '''
-        <div style="position: fixed; 
-                    bottom: 50px; right: 10px; width: 280px; height: auto; 
-                    background-color: white; border:2px solid grey; z-index:9999; font-size:12px;
-                    padding: 10px; border-radius: 5px; box-shadow: 0 0 15px rgba(0,0,0,0.2);">
-            <h4 style="margin: 0 0 10px 0; color: #2c3e50; border-bottom: 2px solid #e74c3c; padding-bottom: 5px;">
-                PUNE DISTRICT - ENVIRONMENTAL STRESS ZONES
-            </h4>
-            
-            <p style="margin: 8px 0; font-weight: bold; color: #2c3e50;">STRESS LEVELS:</p>
-            
-            <div style="margin-bottom: 10px;">
-                <div style="display: flex; align-items: center; margin: 5px 0;">
-                    <div style="width: 15px; height: 15px; background: #e74c3c; border-radius: 50%; margin-right: 8px;"></div>
-                    <span><b>High Stress</b> - Immediate Intervention (ESI > 0.65)</span>
-                </div>
-                <div style="display: flex; align-items: center; margin: 5px 0;">
-                    <div style="width: 15px; height: 15px; background: #f39c12; border-radius: 50%; margin-right: 8px;"></div>
-                    <span><b>Medium Stress</b> - Preventive Measures (ESI 0.45-0.65)</span>
-                </div>
-                <div style="display: flex; align-items: center; margin: 5px 0;">
-                    <div style="width: 15px; height: 15px; background: #2ecc71; border-radius: 50%; margin-right: 8px;"></div>
-                    <span><b>Low Stress</b> - Maintenance Only (ESI < 0.45)</span>
-                </div>
-            </div>
-            
-            <p style="margin: 8px 0; font-weight: bold; color: #2c3e50;">CIRCLE SIZE:</p>
-            <p style="margin: 5px 0; font-size: 11px;">
-                • Larger circles = Higher ESI (more stressed)<br>
-                • Smaller circles = Lower ESI (healthier)
-            </p>
-            
-        </div>
-        '''
-        m.get_root().html.add_child(folium.Element(legend_html))
-        
-        print("✅ Map created successfully")
-        return m._repr_html_(), 200
-        
-    except Exception as e:
-        print(f"❌ Map error: {e}")
-        import traceback
-        traceback.print_exc()
-        return f'<div style="color: red; padding: 2rem;">Error: {str(e)}</div>', 200
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = send_from_directory(app.static_folder, MAP_FILE, mimetype='text/html', max_age=3600)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    return response
 
 @app.route('/api/wards', methods=['GET'])
 def get_wards():
     """All ward data for table"""
-    if df is None:
-        return jsonify([]), 200
-    
-    try:
-        data = df[['ward', 'pm25', 'heat', 'pop_density', 'green_cover', 'esi', 'stress_zone']].copy()
-        data = data.sort_values('esi', ascending=False)
-        return jsonify(data.to_dict('records')), 200
-    except Exception as e:
-        print(f"❌ Wards error: {e}")
-        return jsonify([]), 200
+    return _precomputed_response('wards')
 
 @app.route('/api/insights', methods=['GET'])
 def get_insights():
     """Key insights from data"""
-    if df is None:
-        return jsonify([]), 200
-    
-    try:
-        insights = []
-        
-        critical = len(df[df['stress_zone'] == 'High Stress'])
-        total = len(df)
-        insights.append({
-            'type': 'critical',
-            'icon': '🚨',
-            'title': 'Critical Zones',
-            'text': f"{critical} wards ({critical/total*100:.0f}%) need urgent intervention",
-            'action': 'High ESI > 0.65'
-        })
-        
-        worst_idx = df['pm25'].idxmax()
-        worst_ward = df.loc[worst_idx]
-        avg_pm25 = df['pm25'].mean()
-        pct_above = ((worst_ward['pm25'] / avg_pm25 - 1) * 100) if avg_pm25 > 0 else 0
-        insights.append({
-            'type': 'pollution',
-            'icon': '💨',
-            'title': 'Pollution Hotspot',
-            'text': f"{worst_ward['ward']}: {worst_ward['pm25']:.1f} µg/m³",
-            'action': f"{pct_above:.0f}% above avg"
-        })
-        
-        avg_green = df['green_cover'].mean()
-        target = 0.25
-        gap = (target - avg_green) * 100
-        insights.append({
-            'type': 'green',
-            'icon': '🌳',
-            'title': 'Green Cover Gap',
-            'text': f"Current: {avg_green*100:.1f}% | Target: 25%",
-            'action': f"Need +{gap:.1f}%"
-        })
-        
-        critical_pop = df[df['stress_zone'] == 'High Stress']['population'].sum() if 'population' in df.columns else 0
-        insights.append({
-            'type': 'population',
-            'icon': '👥',
-            'title': 'Population at Risk',
-            'text': f"{critical_pop/1e6:.1f}M people in critical zones",
-            'action': 'Urgent action'
-        })
-        
-        high_budget = df[df['stress_zone'] == 'High Stress']['total_budget'].sum() if 'total_budget' in df.columns else 0
-        total_budget = df['total_budget'].sum() if 'total_budget' in df.columns else 1
-        pct_budget = (high_budget / total_budget * 100) if total_budget > 0 else 0
-        insights.append({
-            'type': 'budget',
-            'icon': '💰',
-            'title': 'Budget Strategy',
-            'text': f"₹{high_budget/10000000:.1f}Cr to critical zones",
-            'action': f"{pct_budget:.0f}% of total"
-        })
-        
-        return jsonify(insights), 200
-        
-    except Exception as e:
-        print(f"❌ Insights error: {e}")
-        return jsonify([]), 200
+    return _precomputed_response('insights')
 
 @app.route('/api/faq', methods=['GET'])
 def get_faq():
     """FAQ data"""
-    faq = [
-        {
-            'question': 'What does "High Stress" mean?',
-            'answer': 'High Stress wards have ESI > 0.65, indicating environmental challenges requiring immediate intervention.'
-        },
-        {
-            'question': 'How is ESI calculated?',
-            'answer': 'Environmental Stress Index = 40% PM2.5 + 20% Heat + 25% Density + 15% Green Deficit'
-        },
-        {
-            'question': 'Which wards need priority?',
-            'answer': 'High Stress wards with high population density should get priority.'
-        },
-        {
-            'question': 'How can ESI be reduced?',
-            'answer': '1) Plant trees (green cover) → 25-30% reduction\n2) Reduce emissions → 15-20% reduction\n3) Improve monitoring'
-        },
-        {
-            'question': 'What is PM2.5?',
-            'answer': 'Particulate matter < 2.5µm. WHO safe limit: 15 µg/m³. High PM2.5 causes respiratory problems.'
-        },
-    ]
-    return jsonify(faq), 200
+    response = Response(FAQ_BYTES, mimetype='application/json', headers=FAQ_HEADERS)
+    response.set_etag(FAQ_ETAG)
+    return response.make_conditional(request)
 
 # ============================================================================
 # RUN
@@ -428,12 +585,13 @@ if __name__ == '__main__':
     
     if df is not None:
         print(f"✅ Data: {len(df)} wards")
-        print(f"✅ High Stress: {len(df[df['stress_zone']=='High Stress'])}")
+        print(f"✅ High Stress: {ZONE_COUNTS.get('High Stress', 0)}")
         print(f"✅ Running on http://localhost:5000")
     else:
         print("❌ CSV not found - running with empty data")
     
+    print("⚠️  Development server only - in production run: gunicorn -c gunicorn.conf.py wsgi:app")
     print("="*80)
     print()
     
-    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+GUNICORN SETTINGS - used by the Dockerfile: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# The dataset and every precomputed payload are built once in the master
+# (preload_app) and shared with the forked workers via copy-on-write, so
+# extra workers cost little memory and one slow request no longer blocks
+# the others the way the single-threaded dev server did.
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count() * 2 + 1)))
+worker_class = 'gthread'
+threads = 2
+timeout = 120
@@ -0,0 +1,6 @@
+"""
+WSGI ENTRY POINT
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import app